@@ -3,14 +3,41 @@ import requests
 import zipfile
 import tarfile
 import io
+import hashlib
+import shutil
 import gdown
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datasets import load_dataset
 
 
 BASE_DIR = "data/corpus"
+MAX_WORKERS = 8
+CHUNK_SIZE = 1024 * 1024
+
+# Published SHA256 of gigaword_data.tar.gz. When set, it is the only digest
+# an archive is checked against. Until it is pinned, the check is
+# trust-on-first-use: the digest of the first archive accepted is recorded
+# in a .sha256 sidecar, which only detects later changes to the file on
+# disk, not a corrupt or partial first download.
+GIGAWORD_SHA256 = None
+
+# Archives below this size are treated as failed downloads (Drive error pages)
+MIN_ARCHIVE_SIZE = 10000
+
 os.makedirs(BASE_DIR, exist_ok=True)
 
 
+def write_jsonl(split_dataset, file_path):
+    """
+    Writes a dataset split as JSONL, one orjson-encoded record per line.
+    """
+    with open(file_path, "wb") as f:
+        for example in split_dataset:
+            f.write(orjson.dumps(example))
+            f.write(b"\n")
+
+
 def save_hf_dataset(dataset_name, subset, output_dir):
     """
     Downloads a Hugging Face dataset and saves each split as JSONL.
@@ -23,7 +50,7 @@ def save_hf_dataset(dataset_name, subset, output_dir):
 
         for split in dataset.keys():
             file_path = os.path.join(output_dir, f"{split}.jsonl")
-            dataset[split].to_json(file_path, orient="records", lines=True)
+            write_jsonl(dataset[split], file_path)
             print(f"Saved {split} to {file_path}")
 
     except Exception as exc:
@@ -42,9 +69,11 @@ def download_file(url, output_path):
         response = requests.get(url, stream=True)
         response.raise_for_status()
 
+        # Copy the raw stream in 1 MiB blocks, letting urllib3 handle
+        # any transfer encoding, instead of iterating small chunks in Python
+        response.raw.decode_content = True
         with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            shutil.copyfileobj(response.raw, f, length=CHUNK_SIZE)
 
         print(f"Saved file to {output_path}")
 
@@ -52,6 +81,44 @@ def download_file(url, output_path):
         print(f"Failed to download {url}: {exc}")
 
 
+def sha256sum(path):
+    """
+    Returns the SHA256 hex digest of a file, read in 1 MiB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def expected_archive_digest(archive_path, pinned_digest):
+    """
+    Returns the digest an archive must match: the pinned one if set,
+    otherwise the one recorded in its sidecar, or None.
+    """
+    if pinned_digest:
+        return pinned_digest
+
+    sidecar_path = f"{archive_path}.sha256"
+    if os.path.exists(sidecar_path):
+        with open(sidecar_path, "r") as f:
+            return f.read().strip() or None
+
+    return None
+
+
+def archive_is_valid(archive_path, expected_digest):
+    """
+    Checks an archive against a known digest. Returns False when no
+    digest is known or the archive is missing.
+    """
+    if expected_digest is None or not os.path.exists(archive_path):
+        return False
+
+    return sha256sum(archive_path) == expected_digest
+
+
 def download_jfleg():
     """
     Grammar correction dataset (JFLEG).
@@ -74,10 +141,14 @@ def download_jfleg():
         "test/test.ref3",
     ]
 
-    for file_path in files:
-        filename = os.path.basename(file_path)
-        url = f"{base_url}/{file_path}"
-        download_file(url, os.path.join(task_dir, filename))
+    urls = [f"{base_url}/{file_path}" for file_path in files]
+    output_paths = [
+        os.path.join(task_dir, os.path.basename(file_path)) for file_path in files
+    ]
+
+    # Fetch files concurrently so per-request latency overlaps
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(download_file, urls, output_paths))
 
 
 def download_hsol():
@@ -120,7 +191,8 @@ def download_sms_spam():
 def download_gigaword():
     """
     Summarization dataset (Gigaword) using a local builder with a manual
-    download fallback for Google Drive.
+    download fallback for Google Drive. If no archive can be fetched, the
+    builder falls back to its own remote download.
     """
     print("Processing Gigaword dataset")
     task_dir = os.path.join(BASE_DIR, "gigaword")
@@ -129,19 +201,58 @@ def download_gigaword():
     file_id = "1USoQ8lJgN8kAWnUnRrupMGrPMLlDVqlV"
     archive_path = os.path.join(task_dir, "gigaword_data.tar.gz")
 
-    if not os.path.exists(archive_path) or os.path.getsize(archive_path) < 10000:
-        url = f"https://drive.google.com/uc?id={file_id}"
-        gdown.download(url, archive_path, quiet=False)
-    else:
+    sidecar_path = f"{archive_path}.sha256"
+    partial_path = f"{archive_path}.part"
+    expected_digest = expected_archive_digest(archive_path, GIGAWORD_SHA256)
+
+    if archive_is_valid(archive_path, expected_digest):
         print("Gigaword archive already present")
 
+    elif (
+        expected_digest is None
+        and os.path.exists(archive_path)
+        and os.path.getsize(archive_path) >= MIN_ARCHIVE_SIZE
+    ):
+        # Archive from before digests were recorded: adopt it on first use
+        with open(sidecar_path, "w") as f:
+            f.write(sha256sum(archive_path))
+        print("Gigaword archive already present, recorded its digest")
+
+    else:
+        # Download beside the archive and only replace it once the new copy
+        # is complete and verified, so a failed fetch never loses the old one
+        url = f"https://drive.google.com/uc?id={file_id}"
+        try:
+            downloaded = gdown.download(url, partial_path, quiet=False)
+        except Exception as exc:
+            print(f"Failed to download Gigaword archive: {exc}")
+            downloaded = None
+
+        digest = sha256sum(partial_path) if downloaded else None
+        if digest and GIGAWORD_SHA256 and digest != GIGAWORD_SHA256:
+            print(f"Gigaword archive checksum mismatch: {digest}")
+            digest = None
+
+        if digest:
+            os.replace(partial_path, archive_path)
+            with open(sidecar_path, "w") as f:
+                f.write(digest)
+        else:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+            # The builder would read an archive that failed verification
+            if os.path.exists(archive_path):
+                print(f"Keeping unverified Gigaword archive at {archive_path}")
+                return
+
     try:
         builder_script = os.path.abspath("data/scripts/gigaword_builder.py")
         dataset = load_dataset(builder_script, trust_remote_code=True)
 
         for split in dataset.keys():
             file_path = os.path.join(task_dir, f"{split}.jsonl")
-            dataset[split].to_json(file_path, orient="records", lines=True)
+            write_jsonl(dataset[split], file_path)
             print(f"Saved {split} to {file_path}")
 
     except Exception as exc:
@@ -151,13 +262,21 @@ def download_gigaword():
 def main():
     print("Starting unified dataset download")
 
-    save_hf_dataset("glue", "mrpc", os.path.join(BASE_DIR, "mrpc"))
-    download_jfleg()
-    download_hsol()
-    save_hf_dataset("glue", "rte", os.path.join(BASE_DIR, "rte"))
-    save_hf_dataset("glue", "sst2", os.path.join(BASE_DIR, "sst2"))
-    download_sms_spam()
-    download_gigaword()
+    # Each task writes to its own directory, so they can run concurrently
+    tasks = [
+        (save_hf_dataset, ("glue", "mrpc", os.path.join(BASE_DIR, "mrpc"))),
+        (download_jfleg, ()),
+        (download_hsol, ()),
+        (save_hf_dataset, ("glue", "rte", os.path.join(BASE_DIR, "rte"))),
+        (save_hf_dataset, ("glue", "sst2", os.path.join(BASE_DIR, "sst2"))),
+        (download_sms_spam, ()),
+        (download_gigaword, ()),
+    ]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(task, *args) for task, args in tasks]
+        for future in futures:
+            future.result()
 
     print("Dataset download completed")
 
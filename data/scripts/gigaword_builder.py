@@ -19,6 +19,8 @@ _CITATION = """
 _DESCRIPTION = "Gigaword summarization dataset adapted from Open-Prompt-Injection."
 _URL = "https://drive.google.com/uc?export=download&id=1USoQ8lJgN8kAWnUnRrupMGrPMLlDVqlV"
 
+READ_BUFFER_SIZE = 1 << 20
+
 
 class Gigaword(datasets.GeneratorBasedBuilder):
     VERSION = datasets.Version("1.2.0")
@@ -88,8 +90,10 @@ class Gigaword(datasets.GeneratorBasedBuilder):
         """
         Yields paired document and summary examples.
         """
-        with open(src_path, encoding="utf-8") as src_file, open(
-            tgt_path, encoding="utf-8"
+        # Lines are read as bytes through 1 MiB buffers and decoded only
+        # after stripping and <unk> replacement
+        with open(src_path, "rb", buffering=READ_BUFFER_SIZE) as src_file, open(
+            tgt_path, "rb", buffering=READ_BUFFER_SIZE
         ) as tgt_file:
             for idx, (doc_line, summary_line) in enumerate(
                 zip(src_file, tgt_file)
@@ -98,10 +102,10 @@ class Gigaword(datasets.GeneratorBasedBuilder):
                 summary = summary_line.strip()
 
                 if replace_unk:
-                    document = document.replace("<unk>", "UNK")
-                    summary = summary.replace("<unk>", "UNK")
+                    document = document.replace(b"<unk>", b"UNK")
+                    summary = summary.replace(b"<unk>", b"UNK")
 
                 yield idx, {
-                    "document": document,
-                    "summary": summary,
+                    "document": document.decode("utf-8"),
+                    "summary": summary.decode("utf-8"),
                 }
@@ -1,15 +1,38 @@
+import csv
+import functools
 import time
-import requests
-import json
-import pandas as pd
+import orjson
 import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 from tqdm import tqdm
 
 from .base_experiment import BaseExperiment
 from harness.evaluator  import PIEvaluator
 
 
+@dataclass(slots=True)
+class AttackPacket:
+    """A single queued attack: source item, payload and optional poisoned document."""
+    item: dict
+    name: str
+    prompt: str
+    search: str
+    doc: Optional[dict] = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_corpus(path, limit):
+    """
+    Parses the corpus once per (path, limit) so back-to-back experiments
+    share the result. Returns a tuple; treat it and its items as read-only.
+    """
+    with open(path, "rb") as f:
+        return tuple(orjson.loads(f.read())[:limit])
+
+
 class PromptInjectionExperiment(BaseExperiment, ABC):
     def run(self):
         """
@@ -35,92 +58,116 @@ class PromptInjectionExperiment(BaseExperiment, ABC):
                 "Dataset not found. Run 'make setup-data' first."
             )
 
-        with open(data_path, "r") as f:
-            return json.load(f)[: self.config["limit"]]
+        # Copy the items so subclasses can mutate them without touching the cache
+        return [dict(item) for item in _load_corpus(data_path, self.config["limit"])]
 
     @abstractmethod
     def _build_attack_queue(self, dataset):
         """
         Must be implemented by Direct and Indirect variants.
+        Returns a list of AttackPacket.
         """
         pass
 
     def _execute_loop(self, attack_queue):
         print(f"Starting attack loop for {len(attack_queue)} samples...")
-        results = []
 
         # Perform a single bulk ingestion of all documents used in the attack
         # This replaces per-sample isolation and improves throughput
-        all_docs = [packet[4] for packet in attack_queue if packet[4] is not None]
+        all_docs = [packet.doc for packet in attack_queue if packet.doc is not None]
         if all_docs:
             print(f"Bulk ingesting {len(all_docs)} documents...")
             self.reset_and_ingest(all_docs)
 
-        for i, packet in enumerate(tqdm(attack_queue, desc="Attacking")):
-            original_item, payload_name, prompt_text, search_text, _ = packet
-            start_time = time.time()
-
-            try:
-                response = requests.post(
-                    f"{self.gateway_host}/chat",
-                    json={
-                        "query": prompt_text,
-                        "search_query": search_text,
-                        "k": 1,
-                        "topology": self.config["topology"],
-                        "profile": self.config["profile"],
-                    },
-                    timeout=90,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                response_text = data["response"]
-                retrieved_context = data.get("context", [])
-
-                # Extract retrieval metadata if a document was returned
-                hit_id = retrieved_context[0]["id"] if retrieved_context else None
-                source_scores = (
-                    retrieved_context[0].get("source_scores", {})
-                    if retrieved_context
-                    else {}
+        # Gateway calls are latency-bound, so packets are sent concurrently.
+        # executor.map preserves queue order in the collected results.
+        with ThreadPoolExecutor(max_workers=self.config.get("concurrency", 4)) as executor:
+            outcomes = list(
+                tqdm(
+                    executor.map(self._attack_packet, range(len(attack_queue)), attack_queue),
+                    total=len(attack_queue),
+                    desc="Attacking",
                 )
+            )
 
-                # Verify whether the expected document was retrieved
-                is_correct_hit = (
-                    hit_id is not None and original_item["id"] in hit_id
-                )
+        results = [result for result in outcomes if result is not None]
+        self._save_results(results)
 
-                # Evaluate the model response using the judge
-                evaluation = self.evaluator.evaluate(response_text)
-
-                results.append(
-                    {
-                        "type": self.config["attack_type"],
-                        "strategy": payload_name,
-                        "query": original_item["query"],
-                        "asv": evaluation["score"],
-                        "reason": evaluation["reasoning"],
-                        "retrieved_id": hit_id,
-                        "retrieval_correct": is_correct_hit,
-                        "dense_rank": source_scores.get("dense_rank"),
-                        "sparse_rank": source_scores.get("sparse_rank"),
-                        "latency": time.time() - start_time,
-                    }
-                )
+    def _attack_packet(self, i, packet):
+        """
+        Sends a single attack packet to the gateway and scores the response.
+        Returns None if the request or evaluation fails.
+        """
+        start_time = time.time()
+
+        try:
+            response = self._post_json(
+                f"{self.gateway_host}/chat",
+                {
+                    "query": packet.prompt,
+                    "search_query": packet.search,
+                    "k": 1,
+                    "topology": self.config["topology"],
+                    "profile": self.config["profile"],
+                },
+                timeout=90,
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            response_text = data["response"]
+            retrieved_context = data.get("context", [])
+
+            # Extract retrieval metadata if a document was returned
+            hit_id = retrieved_context[0]["id"] if retrieved_context else None
+            source_scores = (
+                retrieved_context[0].get("source_scores", {})
+                if retrieved_context
+                else {}
+            )
 
-            except Exception as exc:
-                print(f"Error on sample {i}: {exc}")
+            # Verify whether the expected document was retrieved
+            is_correct_hit = (
+                hit_id is not None and packet.item["id"] in hit_id
+            )
 
-        self._save_results(results)
+            # Evaluate the model response using the judge
+            evaluation = self.evaluator.evaluate(response_text)
+
+            return {
+                "type": self.config["attack_type"],
+                "strategy": packet.name,
+                "query": packet.item["query"],
+                "asv": evaluation["score"],
+                "reason": evaluation["reasoning"],
+                "retrieved_id": hit_id,
+                "retrieval_correct": is_correct_hit,
+                "dense_rank": source_scores.get("dense_rank"),
+                "sparse_rank": source_scores.get("sparse_rank"),
+                "latency": time.time() - start_time,
+            }
+
+        except Exception as exc:
+            print(f"Error on sample {i}: {exc}")
+            return None
 
     def _save_results(self, results):
-        df = pd.DataFrame(results)
         os.makedirs(self.config["output_dir"], exist_ok=True)
 
         csv_path = (
             f"{self.config['output_dir']}/results_{self.config['attack_type']}.csv"
         )
-        df.to_csv(csv_path, index=False)
+
+        # Rows share a fixed schema, so they are written directly without
+        # building a DataFrame
+        fieldnames = list(results[0].keys()) if results else []
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(results)
+
+        if results:
+            asr = sum(result["asv"] for result in results) / len(results)
+            print(f"Attack success rate: {asr:.2%}")
 
         print(f"Results saved to: {csv_path}")
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import time
 
 
@@ -10,6 +13,13 @@ class BaseExperiment(ABC):
         self.retriever_host = "http://localhost:8001"
         self.gateway_host = "http://localhost:8000"
 
+        # Shared keep-alive session so service calls reuse pooled connections
+        self.session = requests.Session()
+        self.session.mount(
+            "http://",
+            HTTPAdapter(pool_connections=16, pool_maxsize=32),
+        )
+
     @abstractmethod
     def run(self):
         """
@@ -17,6 +27,42 @@ class BaseExperiment(ABC):
         """
         pass
 
+    def _post_json(self, url, payload, timeout):
+        """
+        POSTs an orjson-encoded JSON body over the shared session.
+        """
+        return self.session.post(
+            url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+
+    def _post_batch(self, batch):
+        """
+        Ingests a single batch of documents.
+        Returns the exception on failure, or None on success.
+        """
+        payload = {
+            "documents": [
+                {
+                    "id": doc["id"],
+                    "text": doc["text"],
+                    "metadata": doc["metadata"],
+                }
+                for doc in batch
+            ],
+            # The corpus is reloaded after every reset, so skip durable commits
+            "bulk": True,
+        }
+
+        try:
+            response = self._post_json(f"{self.ingest_host}/ingest", payload, timeout=60)
+            response.raise_for_status()
+            return None
+        except Exception as exc:
+            return exc
+
     def reset_and_ingest(self, documents):
         """
         Resets the vector database and ingests a new set of documents.
@@ -25,43 +71,30 @@ class BaseExperiment(ABC):
         # Reset the vector database
         reset_url = f"{self.ingest_host}/reset"
         try:
-            response = requests.post(reset_url, timeout=10)
+            response = self.session.post(reset_url, timeout=10)
             response.raise_for_status()
         except Exception as exc:
             print(f"Critical error: failed to reset database. Error: {exc}")
             raise
 
-        # Ingest documents in batches
-        ingest_url = f"{self.ingest_host}/ingest"
-        batch_size = 50
+        # Ingest documents in concurrent batches
+        batch_size = 256
+        starts = range(0, len(documents), batch_size)
+        batches = [documents[start:start + batch_size] for start in starts]
 
-        for start in range(0, len(documents), batch_size):
-            batch = documents[start:start + batch_size]
-            payload = {
-                "documents": [
-                    {
-                        "id": doc["id"],
-                        "text": doc["text"],
-                        "metadata": doc["metadata"],
-                    }
-                    for doc in batch
-                ]
-            }
+        with ThreadPoolExecutor(max_workers=self.config.get("concurrency", 4)) as executor:
+            errors = list(executor.map(self._post_batch, batches))
 
-            try:
-                response = requests.post(
-                    ingest_url,
-                    json=payload,
-                    timeout=30,
-                )
-                response.raise_for_status()
-            except Exception as exc:
-                print(f"Ingestion failed for batch starting at index {start}. Error: {exc}")
-                raise
+        # Report every failed batch before aborting, rather than only the first
+        failed = [(start, exc) for start, exc in zip(starts, errors) if exc is not None]
+        for start, exc in failed:
+            print(f"Ingestion failed for batch starting at index {start}. Error: {exc}")
+        if failed:
+            raise RuntimeError(f"Ingestion failed for {len(failed)} of {len(batches)} batches")
 
         # Notify the retriever to refresh its index so new documents are visible
         try:
-            requests.post(
+            self.session.post(
                 f"{self.retriever_host}/refresh",
                 timeout=5,
             )
@@ -1,16 +1,29 @@
+import csv
 import os
 import random
-import pandas as pd
-import requests
+import orjson
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
 from harness.attacks.pi.base import BaseExperiment
-from harness.attacks.pi.payloads import get_all_generators
+from harness.attacks.pi.payloads import build_payload, get_all_generators
 from harness.evaluator.PIEvaluator import PIEvaluator
 from harness.tasks.config import TASK_CONFIGS
 from harness.tasks.loader import load_dataset
 
+RESULT_FIELDS = [
+    "target_task",
+    "injected_task",
+    "attack_method",
+    "asv",
+    "asr",
+    "metric",
+    "response_length",
+    "golden_response_snippet",
+    "response_snippet",
+]
+
 
 class UnifiedPIExperiment(BaseExperiment, ABC):
     """
@@ -20,6 +33,8 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
     def __init__(self, config):
         super().__init__(config)
         self.data_cache = {}
+        self.samples = {}
+        self._golden_cache = {}
         self.results = []
         self.evaluator = PIEvaluator()
         self.payload_generators = get_all_generators()
@@ -33,81 +48,85 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
         for task_name, cfg in tqdm(TASK_CONFIGS.items(), desc="Loading datasets"):
             self.data_cache[task_name] = load_dataset(task_name, cfg)
 
+            # Sampled once per task and shared by every pair it appears in
+            self.samples[task_name], _ = self._select_samples(task_name, self.config["limit"])
+
         task_names = list(TASK_CONFIGS.keys())
-        total_pairs = len(task_names) ** 2
+        attacks = []
 
-        with tqdm(total=total_pairs, desc="Task matrix") as pbar:
-            for target_task in task_names:
-                for injected_task in task_names:
+        for target_task in task_names:
+            for injected_task in task_names:
 
-                    # Self-injection omitted in this benchmark configuration
-                    if target_task == injected_task:
-                        pbar.update(1)
-                        continue
+                # Self-injection omitted in this benchmark configuration
+                if target_task == injected_task:
+                    continue
 
-                    pbar.set_description(f"{target_task} -> {injected_task}")
-                    self._run_pair(target_task, injected_task)
-                    pbar.update(1)
+                attacks.extend(self._run_pair(target_task, injected_task))
 
-        self._save_results()
+        # Attacks are bound by gateway/LLM latency, so a bounded number run
+        # concurrently. executor.map keeps results in matrix order.
+        with ThreadPoolExecutor(max_workers=self.config.get("concurrency", 4)) as executor:
+            self._save_results(
+                tqdm(
+                    executor.map(lambda attack: self._execute_chat(**attack), attacks),
+                    total=len(attacks),
+                    desc="Task matrix",
+                )
+            )
 
     def _run_pair(self, target_task, injected_task):
         """
-        Executes all payload-variant attacks for a specific pair.
+        Builds all payload-variant attacks for a specific pair.
+        Returns a list of keyword arguments for _execute_chat.
         """
-        target_samples, _ = self._select_samples(target_task, self.config["limit"])
-        injected_samples, _ = self._select_samples(injected_task, self.config["limit"])
+        target_samples = self.samples[target_task]
+        injected_samples = self.samples[injected_task]
 
         if not target_samples or not injected_samples:
-            return
+            return []
+
+        # Loop-invariant lookups are hoisted out of the per-sample loop
+        injected_instruction = TASK_CONFIGS[injected_task]["injected_instruction"]
+        generators = self.payload_generators
+        num_generators = len(generators)
 
+        attacks = []
         for idx, (target_item, injected_item) in enumerate(zip(target_samples, injected_samples)):
-            name, generator = self.payload_generators[idx % len(self.payload_generators)]
+            name, _ = generators[idx % num_generators]
 
-            injected_instruction = TASK_CONFIGS[injected_task]["injected_instruction"]
-            injected_text = injected_item["text"]
-            full_injection = f"{injected_instruction} {injected_text}"
+            full_injection = f"{injected_instruction} {injected_item['text']}"
+            poisoned_context = build_payload(name, full_injection)
 
-            poisoned_context = generator.inject(full_injection)
+            attacks.append({
+                "target_task": target_task,
+                "injected_task": injected_task,
+                "target_item": target_item,
+                "injected_item": injected_item,
+                "poisoned_context": poisoned_context,
+                "attack_method": name,
+            })
 
-            self._execute_chat(
-                target_task=target_task,
-                injected_task=injected_task,
-                target_item=target_item,
-                injected_item=injected_item,
-                poisoned_context=poisoned_context,
-                attack_method=name,
-            )
+        return attacks
 
     def _execute_chat(self, target_task, injected_task, target_item, injected_item, poisoned_context, attack_method):
         """
         Performs the two-step evaluation:
         1. Golden run for injected-task capability.
         2. Attack run with target task as system and poisoned context as user.
+        Returns the result row, or None if the attack failed.
         """
         try:
-            golden_response = None
-
             # Golden run (only needed for generative injected tasks)
-            try:
-                golden_req = {
-                    "system_prompt": TASK_CONFIGS[injected_task]["instruction"],
-                    "query": f"Context: {injected_item['text']}",
-                    "topology": "pi",
-                    "profile": self.config["profile"],
-                }
-
-                golden_res = requests.post(
-                    f"{self.gateway_host}/chat",
-                    json=golden_req,
-                    timeout=120,
-                )
+            golden_response = self._get_golden_response(injected_task, injected_item)
 
-                if golden_res.status_code == 200:
-                    golden_response = golden_res.json().get("response", "")
+            # Label normalization
+            raw_label = injected_item.get("label")
+            label_map = TASK_CONFIGS[injected_task].get("label_map")
 
-            except Exception:
-                pass
+            if label_map is not None and raw_label in label_map:
+                injected_label = label_map[raw_label]
+            else:
+                injected_label = str(raw_label) if raw_label is not None else None
 
             attack_req = {
                 "system_prompt": TASK_CONFIGS[target_task]["instruction"],
@@ -116,23 +135,21 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
                 "profile": self.config["profile"],
             }
 
-            attack_res = requests.post(
+            # A classification attack is decided once the injected label has
+            # been generated as a whole word, so the gateway may stop there
+            is_classification = TASK_CONFIGS[injected_task]["type"] == "classification"
+            if self.config.get("early_stop") and is_classification and injected_label:
+                attack_req["stream"] = True
+                attack_req["stop_on"] = [injected_label]
+
+            attack_res = self._post_json(
                 f"{self.gateway_host}/chat",
-                json=attack_req,
+                attack_req,
                 timeout=120,
             )
             attack_res.raise_for_status()
 
-            attack_output = attack_res.json().get("response", "")
-
-            # Label normalization
-            raw_label = injected_item.get("label")
-            label_map = TASK_CONFIGS[injected_task].get("label_map")
-
-            if label_map is not None and raw_label in label_map:
-                injected_label = label_map[raw_label]
-            else:
-                injected_label = str(raw_label) if raw_label is not None else None
+            attack_output = orjson.loads(attack_res.content).get("response", "")
 
             scores = self.evaluator.evaluate(
                 target_task=target_task,
@@ -142,7 +159,7 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
                 golden_response=golden_response,
             )
 
-            self.results.append({
+            return {
                 "target_task": target_task,
                 "injected_task": injected_task,
                 "attack_method": attack_method,
@@ -152,10 +169,45 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
                 "response_length": len(attack_output),
                 "golden_response_snippet": (golden_response or "")[:50],
                 "response_snippet": attack_output[:50],
-            })
+            }
 
         except Exception as exc:
             print(f"Error executing {target_task}-{injected_task}: {exc}")
+            return None
+
+    def _get_golden_response(self, injected_task, injected_item):
+        """
+        Runs the injected task on its own clean sample.
+        Depends only on the injected task and sample, so successful
+        responses are cached and shared across target tasks and payloads.
+        """
+        cache_key = (injected_task, injected_item["text"])
+        if cache_key in self._golden_cache:
+            return self._golden_cache[cache_key]
+
+        try:
+            golden_req = {
+                "system_prompt": TASK_CONFIGS[injected_task]["instruction"],
+                "query": f"Context: {injected_item['text']}",
+                "topology": "pi",
+                "profile": self.config["profile"],
+            }
+
+            golden_res = self._post_json(
+                f"{self.gateway_host}/chat",
+                golden_req,
+                timeout=120,
+            )
+
+            if golden_res.status_code == 200:
+                golden_response = orjson.loads(golden_res.content).get("response", "")
+                self._golden_cache[cache_key] = golden_response
+                return golden_response
+
+        except Exception:
+            pass
+
+        return None
 
     def _select_samples(self, task_name, count):
         """
@@ -169,13 +221,23 @@ class UnifiedPIExperiment(BaseExperiment, ABC):
         indices = random.sample(range(len(dataset)), count)
         return [dataset[i] for i in indices], indices
 
-    def _save_results(self):
+    def _save_results(self, rows):
         """
-        Writes all evaluations to disk.
+        Streams evaluations to disk as they complete, so an interrupted
+        run keeps every row finished so far.
         """
         os.makedirs(self.config["output_dir"], exist_ok=True)
 
         path = os.path.join(self.config["output_dir"], "unified_pi_results.csv")
-        pd.DataFrame(self.results).to_csv(path, index=False)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, lineterminator="\n")
+            writer.writeheader()
+
+            for row in rows:
+                if row is None:
+                    continue
+                writer.writerow(row)
+                f.flush()
+                self.results.append(row)
 
         print(f"Saved results to {path}")
@@ -16,6 +16,8 @@ def main(
     seed=42,
     limit=10,
     output_dir="results",
+    concurrency=4,            # Max in-flight gateway requests
+    early_stop=False,         # Stop classification attacks once the label is generated
 ):
     # Validate selected attack
     if attack not in EXPERIMENTS:
@@ -31,6 +33,8 @@ def main(
         "seed": seed,
         "limit": limit,
         "output_dir": output_dir,
+        "concurrency": concurrency,
+        "early_stop": early_stop,
     }
 
     # Instantiate and run the selected experiment
@@ -15,7 +15,8 @@ def load_dataset(task_name, config):
     data_format = config["format"]
 
     if data_format == "jsonl":
-        with open(data_path, "r") as f:
+        # The download script writes raw UTF-8 JSONL
+        with open(data_path, "r", encoding="utf-8") as f:
             for line in f:
                 row = json.loads(line)
                 text_parts = [row[key] for key in config["keys"]]
@@ -1,8 +1,12 @@
 import os
+import re
 import logging
 import time
-import requests
+from contextlib import asynccontextmanager
+import httpx
+import orjson
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
@@ -15,12 +19,33 @@ from middleware import check_policy, log_telemetry
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("gateway")
 
-app = FastAPI(title="Secure RAG Gateway")
-
 RETRIEVER_URL = os.getenv("RETRIEVER_URL", "http://retriever:8001")
 LLM_API_BASE = os.getenv("LLM_API_BASE", "http://host.docker.internal:11434/v1")
 LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "mistral-7b-instruct:q4km")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Owns the shared async HTTP client used for all downstream calls.
+    Pooled keep-alive connections are reused across requests, and calls
+    no longer block the event loop.
+    """
+    app.state.client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
+    yield
+    await app.state.client.aclose()
+
+
+app = FastAPI(
+    title="Secure RAG Gateway",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # ------------------------------------------------------------------
 # Request / Response Models
 # ------------------------------------------------------------------
@@ -40,6 +65,10 @@ class ChatRequest(BaseModel):
     # Used when retriever is bypassed
     documents: Optional[List[Dict[str, Any]]] = None
 
+    # Streams the completion and stops once any of these words appears
+    stream: bool = False
+    stop_on: Optional[List[str]] = None
+
 
 class ChatResponse(BaseModel):
     response: str
@@ -50,7 +79,10 @@ class ChatResponse(BaseModel):
 # Helpers
 # ------------------------------------------------------------------
 
-def fetch_documents(request: ChatRequest) -> List[Dict[str, Any]]:
+async def fetch_documents(
+    client: httpx.AsyncClient,
+    request: ChatRequest,
+) -> List[Dict[str, Any]]:
     """
     Resolve documents based on topology.
     """
@@ -64,17 +96,18 @@ def fetch_documents(request: ChatRequest) -> List[Dict[str, Any]]:
     search_term = request.search_query or request.query
 
     try:
-        response = requests.post(
+        response = await client.post(
             f"{RETRIEVER_URL}/search",
-            json={
+            content=orjson.dumps({
                 "query": search_term,
                 "k": 1,
                 "profile": request.profile,
-            },
+            }),
+            headers=JSON_HEADERS,
             timeout=5,
         )
         response.raise_for_status()
-        return response.json().get("documents", [])
+        return orjson.loads(response.content).get("documents", [])
 
     except Exception as exc:
         logger.error(f"Retriever request failed: {exc}")
@@ -124,6 +157,66 @@ def build_llm_messages(
 
     return system_content, request.query
 
+
+def build_stop_pattern(stop_on: Optional[List[str]]):
+    """
+    Compile stop words into one case-insensitive word-boundary pattern.
+    """
+    if not stop_on:
+        return None
+
+    return re.compile(
+        "|".join(rf"\b{re.escape(word)}\b" for word in stop_on),
+        re.IGNORECASE,
+    )
+
+
+async def stream_completion(
+    client: httpx.AsyncClient,
+    llm_payload: Dict[str, Any],
+    stop_pattern,
+) -> str:
+    """
+    Stream an OpenAI-compatible completion and return the text so far as
+    soon as a stop word has been generated as a complete word. Leaving
+    the stream context closes the upstream request, so the LLM stops
+    generating.
+    """
+    text = ""
+
+    async with client.stream(
+        "POST",
+        f"{LLM_API_BASE}/chat/completions",
+        content=orjson.dumps({**llm_payload, "stream": True}),
+        headers=JSON_HEADERS,
+        timeout=90,
+    ) as response:
+        response.raise_for_status()
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+
+            # Usage and keep-alive chunks arrive with an empty choices list
+            choices = orjson.loads(data).get("choices")
+            if not choices:
+                continue
+
+            text += choices[0].get("delta", {}).get("content") or ""
+
+            # A match touching the end of the text may still be extended
+            # into a longer word by the next chunk, so wait for one more
+            match = stop_pattern.search(text) if stop_pattern else None
+            if match and match.end() < len(text):
+                logger.info("Stop word generated. Closing LLM stream early.")
+                break
+
+    return text
+
 # ------------------------------------------------------------------
 # Endpoint
 # ------------------------------------------------------------------
@@ -139,11 +232,13 @@ async def chat_handler(
         f"Received query (topology={request.topology}): {request.query}"
     )
 
+    client = app.state.client
+
     # 1. Retrieval (or bypass)
-    retrieved_docs = fetch_documents(request)
+    retrieved_docs = await fetch_documents(client, request)
 
     # 2. Policy enforcement (before LLM)
-    check_policy(request.query, retrieved_docs)
+    await check_policy(client, request.query, retrieved_docs)
 
     # 3. Prompt construction
     system_content, user_content = build_llm_messages(
@@ -163,15 +258,21 @@ async def chat_handler(
 
     # 4. LLM call
     try:
-        llm_response = requests.post(
-            f"{LLM_API_BASE}/chat/completions",
-            json=llm_payload,
-            timeout=90,
-        )
-        llm_response.raise_for_status()
-        generated_text = (
-            llm_response.json()["choices"][0]["message"]["content"]
-        )
+        if request.stream:
+            generated_text = await stream_completion(
+                client, llm_payload, build_stop_pattern(request.stop_on)
+            )
+        else:
+            llm_response = await client.post(
+                f"{LLM_API_BASE}/chat/completions",
+                content=orjson.dumps(llm_payload),
+                headers=JSON_HEADERS,
+                timeout=90,
+            )
+            llm_response.raise_for_status()
+            generated_text = (
+                orjson.loads(llm_response.content)["choices"][0]["message"]["content"]
+            )
 
     except Exception as exc:
         logger.error(f"LLM request failed: {exc}")
@@ -184,6 +285,7 @@ async def chat_handler(
     latency = time.time() - start_time
     background_tasks.add_task(
         log_telemetry,
+        client,
         {
             "timestamp": time.time(),
             "latency": latency,
@@ -1,6 +1,7 @@
 import os
 import logging
-import requests
+import httpx
+import orjson
 from fastapi import HTTPException
 
 logger = logging.getLogger("gateway.middleware")
@@ -12,11 +13,13 @@ logger = logging.getLogger("gateway.middleware")
 POLICY_URL = os.getenv("POLICY_URL", "http://policy:8002")
 LOGGER_URL = os.getenv("LOGGER_URL", "http://logger:8003")
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # ------------------------------------------------------------------
 # Policy enforcement
 # ------------------------------------------------------------------
 
-def check_policy(query: str, context: list):
+async def check_policy(client: httpx.AsyncClient, query: str, context: list):
     """
     Sends the query and retrieved context to the policy service.
     Raises HTTPException(403) if the request is blocked.
@@ -27,9 +30,10 @@ def check_policy(query: str, context: list):
     }
 
     try:
-        response = requests.post(
+        response = await client.post(
             f"{POLICY_URL}/inspect",
-            json=payload,
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
             timeout=1.0,
         )
 
@@ -45,11 +49,11 @@ def check_policy(query: str, context: list):
                 f"Policy service returned unexpected status: {response.status_code}"
             )
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         # Fail-open to avoid blocking experiments if the policy service is unavailable
         logger.warning("Policy service unreachable. Proceeding without enforcement.")
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.warning("Policy service request timed out. Proceeding without enforcement.")
 
     except HTTPException:
@@ -63,14 +67,15 @@ def check_policy(query: str, context: list):
 # Telemetry logging
 # ------------------------------------------------------------------
 
-def log_telemetry(metrics: dict):
+async def log_telemetry(client: httpx.AsyncClient, metrics: dict):
     """
     Sends telemetry data to the logger service in the background.
     """
     try:
-        requests.post(
+        await client.post(
             f"{LOGGER_URL}/log",
-            json=metrics,
+            content=orjson.dumps(metrics),
+            headers=JSON_HEADERS,
             timeout=1.0,
         )
     except Exception as exc:
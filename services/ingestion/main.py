@@ -1,12 +1,20 @@
 import os
-import json
+import io
+import math
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import struct
+import threading
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
 from typing import List, Dict, Any
 
-import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from pgvector.psycopg2 import register_vector
+import torch
 from sentence_transformers import SentenceTransformer
 
 # ------------------------------------------------------------------
@@ -30,15 +38,182 @@ DB_HOST = os.getenv("DB_HOST", "vector_db")
 DB_NAME = os.getenv("POSTGRES_DB", "ragdb")
 DB_USER = os.getenv("POSTGRES_USER", "postgres")
 DB_PASS = os.getenv("POSTGRES_PASSWORD", "postgres")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+# Documents encoded and committed together within one /ingest request
+INGEST_CHUNK_SIZE = 256
+
+# Set at image build time; the exported graph is baked in by download_model.py
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+BACKEND_MODEL_FILES = {
+    "onnx": "onnx/model_O2_qint8_static.onnx",
+    "openvino": "openvino/openvino_model_qint8_quantized.xml",
+}
 
 # ------------------------------------------------------------------
 # Embedding model
 # ------------------------------------------------------------------
 
-logger.info("Loading sentence transformer model from local path...")
-model = SentenceTransformer("./model_data", device="cpu")
+def container_cpu_count():
+    """
+    CPUs available to this container: the cgroup v2 CPU quota when one is
+    set, otherwise the CPUs the process may be scheduled on.
+    """
+    cpus = len(os.sched_getaffinity(0))
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+
+# Inference threads follow the container's CPU limit rather than the host's
+# core count, so the intra-op pool does not oversubscribe a capped container
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", container_cpu_count()))
+torch.set_num_threads(EMBEDDING_THREADS)
+torch.set_num_interop_threads(1)
+
+
+def backend_model_kwargs():
+    """
+    Loader arguments for the configured backend: the baked graph to load
+    and, for ONNX Runtime and OpenVINO, their own thread pool sizes.
+    """
+    model_kwargs = {}
+
+    if EMBEDDING_BACKEND in BACKEND_MODEL_FILES:
+        model_kwargs["file_name"] = BACKEND_MODEL_FILES[EMBEDDING_BACKEND]
+
+    if EMBEDDING_BACKEND == "onnx":
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = EMBEDDING_THREADS
+        session_options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = session_options
+
+    elif EMBEDDING_BACKEND == "openvino":
+        model_kwargs["ov_config"] = {"INFERENCE_NUM_THREADS": EMBEDDING_THREADS}
+
+    return model_kwargs
+
+
+# The torch backend moves to a GPU when the image ships a CUDA build of
+# torch and one is visible; larger batches there keep the SMs busy
+EMBEDDING_DEVICE = (
+    "cuda" if EMBEDDING_BACKEND == "torch" and torch.cuda.is_available() else "cpu"
+)
+ENCODE_BATCH_SIZE = 128 if EMBEDDING_DEVICE == "cuda" else 32
+
+logger.info(
+    f"Loading sentence transformer model from local path "
+    f"(backend={EMBEDDING_BACKEND}, device={EMBEDDING_DEVICE}, threads={EMBEDDING_THREADS})..."
+)
+model = SentenceTransformer(
+    "./model_data",
+    device=EMBEDDING_DEVICE,
+    backend=EMBEDDING_BACKEND,
+    model_kwargs=backend_model_kwargs(),
+)
+
+# fp16 weights run on tensor cores
+if EMBEDDING_DEVICE == "cuda":
+    model.half()
+
 logger.info("Embedding model loaded.")
 
+
+def encode_texts(texts):
+    """
+    Embeds texts with one batched forward pass per ENCODE_BATCH_SIZE texts.
+    Blocking; called off the event loop.
+    """
+    return model.encode(
+        texts,
+        batch_size=ENCODE_BATCH_SIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces texts from concurrent requests into shared encode calls.
+    Requests arriving within max_wait seconds of each other are encoded
+    together, up to about max_batch texts, by a single worker task.
+    """
+
+    def __init__(self, max_batch=128, max_wait=0.005):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = None
+        self.worker = None
+
+    async def embed(self, texts):
+        if not texts:
+            return []
+
+        # Started lazily so the queue and worker live on the serving loop
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _collect(self):
+        """
+        Waits for one request, then gathers more until the batch is full
+        or the coalescing window closes.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+
+        while size < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+
+            try:
+                embeddings = await asyncio.to_thread(encode_texts, texts)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            # Hand each request back its own slice, in submission order
+            start = 0
+            for request_texts, future in batch:
+                end = start + len(request_texts)
+                if not future.done():
+                    future.set_result(embeddings[start:end])
+                start = end
+
+
+embedding_batcher = EmbeddingBatcher()
+
 # ------------------------------------------------------------------
 # Request models
 # ------------------------------------------------------------------
@@ -52,28 +227,184 @@ class Document(BaseModel):
 class IngestRequest(BaseModel):
     documents: List[Document]
 
+    # Corpus loads that are rebuilt after every reset may skip durability
+    bulk: bool = False
+
 # ------------------------------------------------------------------
 # Database helpers
 # ------------------------------------------------------------------
 
+# Connections are opened on first use and then kept for every request.
+# psycopg2 pools fail when exhausted, so borrowers queue on a semaphore.
+db_pool = None
+db_pool_lock = threading.Lock()
+db_pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+
+
+def get_db_pool():
+    global db_pool
+
+    with db_pool_lock:
+        if db_pool is None:
+            db_pool = ThreadedConnectionPool(
+                DB_POOL_SIZE,
+                DB_POOL_SIZE,
+                host=DB_HOST,
+                database=DB_NAME,
+                user=DB_USER,
+                password=DB_PASS,
+            )
+        return db_pool
+
+
 def get_db_connection():
+    """
+    Borrows a pooled connection, waiting while all of them are in use.
+    Hand it back with release_db_connection.
+    """
+    db_pool_slots.acquire()
     try:
-        return psycopg2.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-        )
+        conn = get_db_pool().getconn()
+        conn.autocommit = False
+        return conn
     except Exception as exc:
+        db_pool_slots.release()
         logger.error(f"Database connection failed: {exc}")
         raise
 
 
+def release_db_connection(conn):
+    """
+    Returns a borrowed connection to the pool. An open transaction is
+    rolled back, and a connection whose server has gone is discarded.
+    """
+    try:
+        db_pool.putconn(conn)
+    finally:
+        db_pool_slots.release()
+
+
+# Binary COPY framing: signature, flags and header extension length up
+# front, a field count of -1 at the end
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+JSONB_VERSION = b"\x01"
+
+# Each worker thread packs its chunks into one buffer that only ever grows
+copy_buffers = threading.local()
+
+
+def pack_copy_rows(documents, embeddings):
+    """
+    Packs (id, content, metadata, embedding) rows into a binary COPY stream
+    held in this thread's reusable buffer, and returns a view of it.
+    """
+    # Keyed by id so a repeated id keeps its last version, as the per-row
+    # upsert did; a merge may not touch the same row twice
+    rows = {}
+    for index, doc in enumerate(documents):
+        rows[doc.id] = (
+            doc.id.encode(),
+            doc.text.encode(),
+            JSONB_VERSION + orjson.dumps(doc.metadata),
+            index,
+        )
+
+    # pgvector's binary format: int16 dim, int16 unused, big-endian float4s
+    vectors = np.ascontiguousarray(embeddings, dtype=">f4")
+    dim = vectors.shape[-1]
+    vector_bytes = memoryview(vectors).cast("B")
+    vector_size = 4 + 4 * dim
+
+    size = len(PGCOPY_HEADER) + len(PGCOPY_TRAILER) + sum(
+        2 + 4 * 4 + len(doc_id) + len(content) + len(metadata) + vector_size
+        for doc_id, content, metadata, _ in rows.values()
+    )
+
+    buffer = getattr(copy_buffers, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = copy_buffers.buffer = bytearray(max(size, 2 * len(buffer or b"")))
+
+    offset = len(PGCOPY_HEADER)
+    buffer[:offset] = PGCOPY_HEADER
+
+    for doc_id, content, metadata, index in rows.values():
+        struct.pack_into(">h", buffer, offset, 4)
+        offset += 2
+
+        for field in (doc_id, content, metadata):
+            struct.pack_into(">i", buffer, offset, len(field))
+            offset += 4
+            buffer[offset:offset + len(field)] = field
+            offset += len(field)
+
+        struct.pack_into(">ihh", buffer, offset, vector_size, dim, 0)
+        offset += 8
+        buffer[offset:offset + 4 * dim] = vector_bytes[4 * dim * index:4 * dim * (index + 1)]
+        offset += 4 * dim
+
+    buffer[offset:offset + len(PGCOPY_TRAILER)] = PGCOPY_TRAILER
+    offset += len(PGCOPY_TRAILER)
+
+    return memoryview(buffer)[:offset]
+
+
+def copy_documents(cur, documents, embeddings):
+    """
+    Streams documents into a temporary staging table with binary COPY,
+    then merges them into documents with a single upsert.
+    """
+    stream = pack_copy_rows(documents, embeddings)
+
+    cur.execute("CREATE TEMP TABLE ingest_stage (LIKE documents) ON COMMIT DROP")
+    cur.copy_expert(
+        "COPY ingest_stage (id, content, metadata, embedding) FROM STDIN WITH (FORMAT binary)",
+        io.BytesIO(stream),
+        size=len(stream),
+    )
+    cur.execute(
+        """
+        INSERT INTO documents (id, content, metadata, embedding)
+        SELECT id, content, metadata, embedding FROM ingest_stage
+        ON CONFLICT (id) DO UPDATE
+        SET content = EXCLUDED.content,
+            metadata = EXCLUDED.metadata,
+            embedding = EXCLUDED.embedding
+        """
+    )
+
+
+def store_documents(documents, embeddings, bulk=False):
+    """
+    Writes one request's documents in a single transaction.
+    Blocking; called off the event loop.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    try:
+        # A bulk load does not wait for its WAL to be flushed on commit
+        if bulk:
+            cur.execute("SET LOCAL synchronous_commit = off")
+
+        copy_documents(cur, documents, embeddings)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        release_db_connection(conn)
+
+
 @app.on_event("startup")
 def startup_db():
     """
     Initializes the database schema and required extensions.
     """
+    conn = None
     try:
         conn = get_db_connection()
         conn.autocommit = True
@@ -95,11 +426,28 @@ def startup_db():
         )
 
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         logger.info("Database schema initialized.")
 
     except Exception as exc:
         logger.critical(f"Startup initialization failed: {exc}")
+        if conn:
+            release_db_connection(conn)
+
+
+@app.on_event("startup")
+def warm_up_encoder():
+    """
+    Runs one full batch of representative length through the encoder, so
+    kernel selection, allocator growth and lazy imports are paid before
+    the first /ingest request rather than during it.
+    """
+    try:
+        encode_texts(["warmup " * 128] * ENCODE_BATCH_SIZE)
+        logger.info("Embedding model warmed up.")
+
+    except Exception as exc:
+        logger.warning(f"Encoder warmup failed: {exc}")
 
 
 # ------------------------------------------------------------------
@@ -107,53 +455,41 @@ def startup_db():
 # ------------------------------------------------------------------
 
 @app.post("/ingest")
-async def ingest_documents(request: IngestRequest):
+async def ingest_documents(raw_request: Request):
+    # Validated straight from the raw bytes by pydantic-core's JSON parser,
+    # skipping FastAPI's json.loads into Python objects first
+    try:
+        request = IngestRequest.model_validate_json(await raw_request.body())
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+        )
+
     logger.info(f"Received ingestion request for {len(request.documents)} documents.")
 
-    conn = get_db_connection()
-    register_vector(conn)
-    cur = conn.cursor()
+    indexed_count = 0
 
     try:
-        indexed_count = 0
-
-        for doc in request.documents:
-            logger.info(f"Indexing document: {doc.id}")
-
-            # Generate embedding
-            embedding = model.encode(doc.text).tolist()
-
-            # Serialize metadata
-            metadata_json = json.dumps(doc.metadata)
-
-            # Insert or update document
-            cur.execute(
-                """
-                INSERT INTO documents (id, content, metadata, embedding)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (id) DO UPDATE
-                SET content = EXCLUDED.content,
-                    metadata = EXCLUDED.metadata,
-                    embedding = EXCLUDED.embedding
-                """,
-                (doc.id, doc.text, metadata_json, embedding),
-            )
+        # Encoding and the database write both block, so they run in worker
+        # threads and the event loop keeps serving concurrent requests.
+        # Encoding is shared with whatever other requests are in flight.
+        # Large requests go in committed chunks, so embeddings and COPY
+        # buffers are held for one chunk at a time and a failure loses at
+        # most the chunk in progress.
+        for start in range(0, len(request.documents), INGEST_CHUNK_SIZE):
+            chunk = request.documents[start:start + INGEST_CHUNK_SIZE]
+
+            embeddings = await embedding_batcher.embed([doc.text for doc in chunk])
+            await asyncio.to_thread(store_documents, chunk, embeddings, request.bulk)
+            indexed_count += len(chunk)
 
-            indexed_count += 1
-
-        conn.commit()
         logger.info(f"Successfully indexed {indexed_count} documents.")
         return {"status": "success", "indexed": indexed_count}
 
     except Exception as exc:
-        logger.error(f"Ingestion failed: {exc}")
-        conn.rollback()
+        logger.error(f"Ingestion failed after {indexed_count} documents: {exc}")
         raise HTTPException(status_code=500, detail=str(exc))
 
-    finally:
-        cur.close()
-        conn.close()
-
 
 @app.post("/reset")
 def reset_database():
@@ -172,14 +508,14 @@ def reset_database():
         cur.execute("TRUNCATE TABLE documents;")
 
         cur.close()
-        conn.close()
+        release_db_connection(conn)
         logger.info("Database reset completed.")
         return {"status": "success", "message": "Vector database truncated"}
 
     except Exception as exc:
         logger.error(f"Database reset failed: {exc}")
         if conn:
-            conn.close()
+            release_db_connection(conn)
         raise HTTPException(status_code=500, detail=str(exc))
 
 